@@ -2,6 +2,8 @@
 
 import pytest
 
+from meow_me.tools import image as image_mod
+
 # Sample MeowFacts API responses
 SAMPLE_SINGLE_FACT_RESPONSE = {
     "data": ["Cats sleep 70% of their lives."]
@@ -49,6 +51,22 @@ SAMPLE_CHAT_POST_FAILURE = {
 }
 
 
+@pytest.fixture(autouse=True)
+def _reset_image_state():
+    """Clear the image module's stash and job table around every test."""
+    image_mod._last_generated_image.clear()
+    image_mod._pending_jobs.clear()
+    yield
+    image_mod._last_generated_image.clear()
+    image_mod._pending_jobs.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clean_openai_env(monkeypatch):
+    """Start every test without OPENAI_API_KEY; tests that need it set it."""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+
 @pytest.fixture
 def single_fact_response():
     return SAMPLE_SINGLE_FACT_RESPONSE
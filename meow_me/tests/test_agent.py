@@ -7,9 +7,13 @@ remotely via the Arcade platform. Tests focus on:
 - Capability detection and prompt adaptation
 """
 
+import contextlib
+import inspect
+import io
+
 import pytest
-from unittest.mock import patch
 
+import meow_me.agent as agent_mod
 from meow_me.agent import (
     SYSTEM_PROMPT,
     DEMO_FACTS,
@@ -18,54 +22,53 @@ from meow_me.agent import (
     run_demo,
 )
 
+MCP_TOOL_NAMES = frozenset({
+    "MeowMe_GetCatFact", "MeowMe_GetUserAvatar",
+    "MeowMe_StartCatImageGeneration", "MeowMe_CheckImageStatus",
+    "MeowMe_SendCatFact", "MeowMe_SendCatImage",
+    "MeowMe_MeowMe",
+})
+
+# Everything SYSTEM_PROMPT must mention: MCP-namespaced tools, routing rules,
+# the two-phase flow, Arcade deployment, and guidance for interpreting tool
+# fallbacks. Polling for the async image is checked case-insensitively.
+REQUIRED_PROMPT_TOKENS = MCP_TOOL_NAMES | {
+    "ROUTING RULES", "MeowMe_MeowMe()", "standalone, no modifiers",
+    "FACT PHASE", "DELIVERY PHASE",
+    "Meow me to #random", "INTERACTIVE",
+    "Arcade",
+    "HANDLING TOOL RESPONSES", "image_sent=false",
+}
+
+# Tools dropped in the cloud-first refactor; neither the prompt nor the demo
+# may mention them
+REMOVED_TOOL_NAMES = ("MeowMe_GenerateCatImage", "MeowMe_SaveImageLocally")
+
+DEMO_SECTIONS = ("SCENARIO 1", "SCENARIO 2", "SCENARIO 3", "SCENARIO 4", "DEMO COMPLETE")
+
+
+@pytest.fixture(scope="module")
+def demo_output():
+    """Run the scripted demo once and share its stdout across tests."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        run_demo()
+    return buf.getvalue()
+
 
 # --- System prompt validation ---
 
 class TestSystemPrompt:
-    def test_mentions_all_mcp_tools(self):
-        """System prompt references all tools with MeowMe_ prefix."""
-        for tool_name in [
-            "MeowMe_GetCatFact", "MeowMe_GetUserAvatar",
-            "MeowMe_StartCatImageGeneration", "MeowMe_CheckImageStatus",
-            "MeowMe_SendCatFact", "MeowMe_SendCatImage",
-            "MeowMe_MeowMe",
-        ]:
-            assert tool_name in SYSTEM_PROMPT, f"{tool_name} not found in SYSTEM_PROMPT"
+    def test_contains_required_tokens(self):
+        """Tools, routing rules, and response guidance all appear in the prompt."""
+        missing = sorted(t for t in REQUIRED_PROMPT_TOKENS if t not in SYSTEM_PROMPT)
+        assert not missing, f"missing from SYSTEM_PROMPT: {missing}"
+        assert "poll" in SYSTEM_PROMPT.lower()
 
     def test_does_not_reference_removed_tools(self):
         """System prompt should not reference old tools."""
-        assert "MeowMe_GenerateCatImage" not in SYSTEM_PROMPT
-        assert "MeowMe_SaveImageLocally" not in SYSTEM_PROMPT
-
-    def test_contains_routing_rules(self):
-        assert "ROUTING RULES" in SYSTEM_PROMPT
-        assert "MeowMe_MeowMe()" in SYSTEM_PROMPT
-
-    def test_meow_me_one_shot_instruction(self):
-        assert "standalone, no modifiers" in SYSTEM_PROMPT
-
-    def test_two_phase_flow(self):
-        assert "FACT PHASE" in SYSTEM_PROMPT
-        assert "DELIVERY PHASE" in SYSTEM_PROMPT
-
-    def test_interactive_modifiers_documented(self):
-        assert "Meow me to #random" in SYSTEM_PROMPT
-        assert "INTERACTIVE" in SYSTEM_PROMPT
-
-    def test_mentions_arcade_deployment(self):
-        """System prompt indicates tools are Arcade-deployed."""
-        assert "Arcade" in SYSTEM_PROMPT
-
-    def test_async_image_flow_documented(self):
-        """System prompt documents the async start/poll pattern."""
-        assert "StartCatImageGeneration" in SYSTEM_PROMPT
-        assert "CheckImageStatus" in SYSTEM_PROMPT
-        assert "poll" in SYSTEM_PROMPT.lower()
-
-    def test_handling_tool_responses_section(self):
-        """System prompt has guidance for interpreting tool fallbacks."""
-        assert "HANDLING TOOL RESPONSES" in SYSTEM_PROMPT
-        assert "image_sent=false" in SYSTEM_PROMPT
+        stale = [t for t in REMOVED_TOOL_NAMES if t in SYSTEM_PROMPT]
+        assert not stale, f"SYSTEM_PROMPT still references: {stale}"
 
 
 # --- Demo mode validation ---
@@ -79,40 +82,24 @@ class TestDemoMode:
             assert isinstance(fact, str)
             assert len(fact) > 10
 
-    def test_demo_runs_without_error(self, capsys):
-        run_demo()
-        captured = capsys.readouterr()
-        assert "SCENARIO 1" in captured.out
-        assert "SCENARIO 2" in captured.out
-        assert "SCENARIO 3" in captured.out
-        assert "SCENARIO 4" in captured.out
-        assert "DEMO COMPLETE" in captured.out
-
-    def test_demo_shows_all_mcp_tools(self, capsys):
+    def test_demo_runs_without_error(self, demo_output):
+        missing = [s for s in DEMO_SECTIONS if s not in demo_output]
+        assert not missing, f"missing from demo output: {missing}"
+
+    def test_demo_shows_all_mcp_tools(self, demo_output):
         """Demo references tools by MCP-namespaced names."""
-        run_demo()
-        captured = capsys.readouterr()
-        for tool_name in [
-            "MeowMe_GetCatFact", "MeowMe_GetUserAvatar",
-            "MeowMe_StartCatImageGeneration", "MeowMe_CheckImageStatus",
-            "MeowMe_SendCatFact", "MeowMe_SendCatImage",
-            "MeowMe_MeowMe",
-        ]:
-            assert tool_name in captured.out, f"{tool_name} not in demo output"
-
-    def test_demo_does_not_reference_removed_tools(self, capsys):
+        missing = sorted(t for t in MCP_TOOL_NAMES if t not in demo_output)
+        assert not missing, f"missing from demo output: {missing}"
+
+    def test_demo_does_not_reference_removed_tools(self, demo_output):
         """Demo should not mention old tools."""
-        run_demo()
-        captured = capsys.readouterr()
-        assert "MeowMe_GenerateCatImage" not in captured.out
-        assert "MeowMe_SaveImageLocally" not in captured.out
+        stale = [t for t in REMOVED_TOOL_NAMES if t in demo_output]
+        assert not stale, f"demo output still references: {stale}"
 
-    def test_demo_shows_async_polling(self, capsys):
+    def test_demo_shows_async_polling(self, demo_output):
         """Demo scenario 3 should show the start/poll pattern."""
-        run_demo()
-        captured = capsys.readouterr()
-        assert "StartCatImageGeneration" in captured.out
-        assert "CheckImageStatus" in captured.out
+        assert "StartCatImageGeneration" in demo_output
+        assert "CheckImageStatus" in demo_output
 
 
 # --- Arcade SDK integration ---
@@ -122,31 +109,23 @@ class TestArcadeIntegration:
 
     def test_agent_does_not_import_tool_modules(self):
         """Verify agent.py has no imports from meow_me.tools.*"""
-        import inspect
-        import meow_me.agent as agent_mod
         source = inspect.getsource(agent_mod)
         assert "from meow_me.tools" not in source
         assert "import meow_me.tools" not in source
 
     def test_agent_uses_arcade_sdk(self):
         """Verify agent.py references Arcade SDK components."""
-        import inspect
-        import meow_me.agent as agent_mod
         source = inspect.getsource(agent_mod)
         assert "AsyncArcade" in source
         assert "get_arcade_tools" in source
 
     def test_agent_has_no_function_tool_wrappers(self):
         """Verify agent.py doesn't define @function_tool wrappers."""
-        import inspect
-        import meow_me.agent as agent_mod
         source = inspect.getsource(agent_mod)
         assert "@function_tool" not in source
 
     def test_agent_has_no_slack_flag(self):
         """Verify agent.py doesn't have --slack flag (removed in cloud-first refactor)."""
-        import inspect
-        import meow_me.agent as agent_mod
         source = inspect.getsource(agent_mod)
         assert '"--slack"' not in source
         assert "_slack_config" not in source
@@ -156,27 +135,23 @@ class TestArcadeIntegration:
 # --- Capability detection ---
 
 class TestCapabilityDetection:
-    def test_detects_no_keys(self):
-        with patch.dict("os.environ", {}, clear=True):
-            caps = _detect_capabilities()
-        assert caps["arcade"] is False
-
-    def test_detects_arcade_key(self):
-        with patch.dict("os.environ", {"ARCADE_API_KEY": "arc-test"}, clear=True):
-            caps = _detect_capabilities()
-        assert caps["arcade"] is True
-
-    def test_only_has_arcade_key(self):
-        """Capability dict should only have arcade (secrets are cloud-side)."""
-        with patch.dict("os.environ", {}, clear=True):
-            caps = _detect_capabilities()
-        assert set(caps.keys()) == {"arcade"}
-
-    def test_openai_key_not_in_capabilities(self):
-        """OPENAI_API_KEY is a cloud secret, not detected locally."""
-        with patch.dict("os.environ", {"OPENAI_API_KEY": "sk-test"}, clear=True):
-            caps = _detect_capabilities()
-        assert "openai" not in caps
+    # Capabilities only track ARCADE_API_KEY; secrets like OPENAI_API_KEY
+    # live cloud-side and are never detected locally.
+    @pytest.mark.parametrize(
+        "env, expected",
+        [
+            ({}, {"arcade": False}),
+            ({"ARCADE_API_KEY": "arc-test"}, {"arcade": True}),
+            ({"OPENAI_API_KEY": "sk-test"}, {"arcade": False}),
+        ],
+        ids=["no_keys", "arcade_key", "openai_key_ignored"],
+    )
+    def test_detect_capabilities(self, monkeypatch, env, expected):
+        for key in ("ARCADE_API_KEY", "OPENAI_API_KEY"):
+            monkeypatch.delenv(key, raising=False)
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        assert _detect_capabilities() == expected
 
 
 class TestCapabilityPrompt:
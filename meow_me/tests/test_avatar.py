@@ -1,9 +1,11 @@
 """Tests for the Slack avatar tools (avatar.py)."""
 
+import httpx
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+import respx
 
 from meow_me.tools.avatar import (
+    SLACK_API_BASE,
     _get_own_user_id,
     _get_user_info,
     _extract_avatar_url,
@@ -26,69 +28,53 @@ SAMPLE_USER_INFO = {
 }
 
 
-def _make_mock_client(response_data: dict, method: str = "post"):
-    """Create a mock httpx.AsyncClient with a preset response."""
-    mock_response = MagicMock()
-    mock_response.json.return_value = response_data
-    mock_response.raise_for_status = MagicMock()
+AUTH_TEST_URL = f"{SLACK_API_BASE}/auth.test"
+USERS_INFO_URL = f"{SLACK_API_BASE}/users.info"
 
-    mock_client = AsyncMock()
-    getattr(mock_client, method).return_value = mock_response
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    return mock_client
+AUTH_TEST_OK = {"ok": True, "user_id": "U012ABC"}
+AUTH_TEST_FAILURE = {"ok": False, "error": "invalid_auth"}
+USERS_INFO_OK = {"ok": True, "user": SAMPLE_USER_INFO}
+USERS_INFO_NOT_FOUND = {"ok": False, "error": "user_not_found"}
 
 
 # --- Tests for _get_own_user_id ---
 
 class TestGetOwnUserId:
-    @pytest.mark.asyncio
+    @respx.mock
     async def test_returns_user_id(self):
-        mock_client = _make_mock_client({"ok": True, "user_id": "U012ABC"})
-        with patch("meow_me.tools.avatar.httpx.AsyncClient", return_value=mock_client):
-            result = await _get_own_user_id("xoxb-token")
+        respx.post(AUTH_TEST_URL).mock(return_value=httpx.Response(200, json=AUTH_TEST_OK))
+        result = await _get_own_user_id("xoxb-token")
         assert result == "U012ABC"
 
-    @pytest.mark.asyncio
+    @respx.mock
     async def test_raises_on_failure(self):
-        mock_client = _make_mock_client({"ok": False, "error": "invalid_auth"})
-        with patch("meow_me.tools.avatar.httpx.AsyncClient", return_value=mock_client):
-            with pytest.raises(RuntimeError, match="invalid_auth"):
-                await _get_own_user_id("bad-token")
+        respx.post(AUTH_TEST_URL).mock(return_value=httpx.Response(200, json=AUTH_TEST_FAILURE))
+        with pytest.raises(RuntimeError, match="invalid_auth"):
+            await _get_own_user_id("bad-token")
 
 
 # --- Tests for _get_user_info ---
 
 class TestGetUserInfo:
-    @pytest.mark.asyncio
+    @respx.mock
     async def test_returns_user_object(self):
-        mock_client = _make_mock_client(
-            {"ok": True, "user": SAMPLE_USER_INFO}, method="get"
-        )
-        with patch("meow_me.tools.avatar.httpx.AsyncClient", return_value=mock_client):
-            result = await _get_user_info("xoxb-token", "U012ABC")
+        respx.get(USERS_INFO_URL).mock(return_value=httpx.Response(200, json=USERS_INFO_OK))
+        result = await _get_user_info("xoxb-token", "U012ABC")
         assert result["id"] == "U012ABC"
         assert result["profile"]["image_512"] == "https://avatars.slack-edge.com/alex_512.png"
 
-    @pytest.mark.asyncio
+    @respx.mock
     async def test_raises_on_failure(self):
-        mock_client = _make_mock_client(
-            {"ok": False, "error": "user_not_found"}, method="get"
-        )
-        with patch("meow_me.tools.avatar.httpx.AsyncClient", return_value=mock_client):
-            with pytest.raises(RuntimeError, match="user_not_found"):
-                await _get_user_info("xoxb-token", "U_BAD")
-
-    @pytest.mark.asyncio
+        respx.get(USERS_INFO_URL).mock(return_value=httpx.Response(200, json=USERS_INFO_NOT_FOUND))
+        with pytest.raises(RuntimeError, match="user_not_found"):
+            await _get_user_info("xoxb-token", "U_BAD")
+
+    @respx.mock
     async def test_calls_users_info_endpoint(self):
-        mock_client = _make_mock_client(
-            {"ok": True, "user": SAMPLE_USER_INFO}, method="get"
-        )
-        with patch("meow_me.tools.avatar.httpx.AsyncClient", return_value=mock_client):
-            await _get_user_info("xoxb-token", "U012ABC")
-        call_args = mock_client.get.call_args
-        assert "users.info" in call_args[0][0]
-        assert call_args[1]["params"]["user"] == "U012ABC"
+        route = respx.get(USERS_INFO_URL).mock(return_value=httpx.Response(200, json=USERS_INFO_OK))
+        await _get_user_info("xoxb-token", "U012ABC")
+        assert route.called
+        assert route.calls.last.request.url.params["user"] == "U012ABC"
 
 
 # --- Tests for _extract_avatar_url ---
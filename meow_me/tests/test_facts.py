@@ -1,9 +1,10 @@
 """Tests for the cat facts tool (facts.py)."""
 
+import httpx
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+import respx
 
-from meow_me.tools.facts import _parse_facts_response, get_cat_fact
+from meow_me.tools.facts import MEOWFACTS_URL, _parse_facts_response, get_cat_fact
 
 SAMPLE_SINGLE_FACT_RESPONSE = {"data": ["Cats sleep 70% of their lives."]}
 SAMPLE_MULTI_FACT_RESPONSE = {
@@ -44,111 +45,30 @@ class TestParseFactsResponse:
 
 # --- Tests for get_cat_fact tool ---
 
+def _assert_meowfacts_call(route, expected_count_param: str) -> None:
+    """Exactly one MeowFacts request was made, with the given count param."""
+    assert route.call_count == 1
+    assert route.calls.last.request.url.params["count"] == expected_count_param
+
+
 class TestGetCatFact:
-    @pytest.mark.asyncio
-    async def test_fetch_single_fact(self):
-        mock_response = MagicMock()
-        mock_response.json.return_value = SAMPLE_SINGLE_FACT_RESPONSE
-        mock_response.raise_for_status = MagicMock()
-
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
-
-        with patch("meow_me.tools.facts.httpx.AsyncClient", return_value=mock_client):
-            result = await get_cat_fact(count=1)
-
-        assert result["count"] == 1
-        assert len(result["facts"]) == 1
-        assert result["facts"][0] == "Cats sleep 70% of their lives."
-
-    @pytest.mark.asyncio
-    async def test_fetch_multiple_facts(self):
-        mock_response = MagicMock()
-        mock_response.json.return_value = SAMPLE_MULTI_FACT_RESPONSE
-        mock_response.raise_for_status = MagicMock()
-
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
-
-        with patch("meow_me.tools.facts.httpx.AsyncClient", return_value=mock_client):
-            result = await get_cat_fact(count=3)
-
-        assert result["count"] == 3
-        assert len(result["facts"]) == 3
-
-    @pytest.mark.asyncio
-    async def test_count_clamped_to_minimum(self):
-        """Count below 1 should be clamped to 1."""
-        mock_response = MagicMock()
-        mock_response.json.return_value = SAMPLE_SINGLE_FACT_RESPONSE
-        mock_response.raise_for_status = MagicMock()
-
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
-
-        with patch("meow_me.tools.facts.httpx.AsyncClient", return_value=mock_client):
-            result = await get_cat_fact(count=0)
-
-        # Should have requested count=1 (clamped)
-        mock_client.get.assert_called_once()
-        call_kwargs = mock_client.get.call_args
-        assert call_kwargs[1]["params"]["count"] == 1
-
-    @pytest.mark.asyncio
-    async def test_count_clamped_to_maximum(self):
-        """Count above 5 should be clamped to 5."""
-        mock_response = MagicMock()
-        mock_response.json.return_value = SAMPLE_MULTI_FACT_RESPONSE
-        mock_response.raise_for_status = MagicMock()
-
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
-
-        with patch("meow_me.tools.facts.httpx.AsyncClient", return_value=mock_client):
-            result = await get_cat_fact(count=10)
-
-        call_kwargs = mock_client.get.call_args
-        assert call_kwargs[1]["params"]["count"] == 5
-
-    @pytest.mark.asyncio
-    async def test_empty_api_response(self):
-        mock_response = MagicMock()
-        mock_response.json.return_value = SAMPLE_EMPTY_FACT_RESPONSE
-        mock_response.raise_for_status = MagicMock()
-
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
-
-        with patch("meow_me.tools.facts.httpx.AsyncClient", return_value=mock_client):
-            result = await get_cat_fact(count=1)
-
-        assert result["count"] == 0
-        assert result["facts"] == []
-
-    @pytest.mark.asyncio
-    async def test_api_url_correct(self):
-        """Verify we hit the correct MeowFacts URL."""
-        mock_response = MagicMock()
-        mock_response.json.return_value = SAMPLE_SINGLE_FACT_RESPONSE
-        mock_response.raise_for_status = MagicMock()
-
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
-
-        with patch("meow_me.tools.facts.httpx.AsyncClient", return_value=mock_client):
-            await get_cat_fact(count=1)
-
-        call_args = mock_client.get.call_args
-        assert "meowfacts.herokuapp.com" in call_args[0][0]
+    @pytest.mark.parametrize(
+        "count, sample, expected_param, expected_count",
+        [
+            (1, SAMPLE_SINGLE_FACT_RESPONSE, "1", 1),
+            (3, SAMPLE_MULTI_FACT_RESPONSE, "3", 3),
+            (0, SAMPLE_SINGLE_FACT_RESPONSE, "1", 1),
+            (10, SAMPLE_MULTI_FACT_RESPONSE, "5", 3),
+            (1, SAMPLE_EMPTY_FACT_RESPONSE, "1", 0),
+        ],
+        ids=["single", "multiple", "clamped_to_minimum", "clamped_to_maximum", "empty_response"],
+    )
+    @respx.mock
+    async def test_get_cat_fact(self, count, sample, expected_param, expected_count):
+        route = respx.get(MEOWFACTS_URL).mock(return_value=httpx.Response(200, json=sample))
+
+        result = await get_cat_fact(count=count)
+
+        assert result["count"] == expected_count
+        assert result["facts"] == sample["data"]
+        _assert_meowfacts_call(route, expected_param)